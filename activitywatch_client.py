@@ -1,24 +1,122 @@
 """Client for fetching screen time data from ActivityWatch."""
 
-import requests
-from datetime import datetime, timedelta
+import atexit
+import functools
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import urllib3
+from datetime import date as date_type, datetime, timedelta, timezone
 from typing import Optional, List, Tuple
-from urllib.parse import urlparse
+from urllib.parse import quote, urlencode, urlsplit
+from urllib3.util.retry import Retry
+
+# orjson decodes large event lists several times faster; fall back to the
+# stdlib if it isn't installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 from config import (
     ACTIVITYWATCH_API_BASE,
     SOCIAL_APPS,
     GPT_DOMAINS,
+    EVENT_CACHE_FILE,
+    SETTLE_MARGIN_SEC,
+)
+
+# Tracked app names and domains, lowercased once at import
+_SOCIAL_APPS_LC = tuple(app.lower() for app in SOCIAL_APPS)
+_GPT_DOMAINS_LC = tuple(domain.lower() for domain in GPT_DOMAINS)
+
+# Single-pass matcher built from the lowercased patterns, so each event is
+# scanned once instead of once per configured pattern. Subjects are lowered
+# before matching, which is cheaper than a re.IGNORECASE search.
+_SOCIAL_RE = re.compile("|".join(re.escape(app) for app in _SOCIAL_APPS_LC))
+
+# Most window events carry exactly one of the configured app names, so an
+# exact set lookup resolves them before falling back to the substring scan
+_SOCIAL_APPS_EXACT = frozenset(_SOCIAL_APPS_LC)
+
+# GPT domains match either exactly or as a parent domain of the URL's host
+_GPT_DOMAINS_EXACT = frozenset(_GPT_DOMAINS_LC)
+_GPT_DOMAIN_SUFFIXES = tuple("." + domain for domain in _GPT_DOMAINS_LC)
+
+# The same matching rules as regexes for server-side ActivityWatch queries.
+# Query strings are taken verbatim up to the closing quote, so any double
+# quote is written as a regex escape instead.
+_SOCIAL_QUERY_REGEX = ("(?i)" + _SOCIAL_RE.pattern).replace('"', r"\x22")
+_GPT_URL_QUERY_REGEX = (
+    r"(?i)^[a-z][a-z0-9+.-]*://([^/?#@]*@)?([^/?#:]*\.)?("
+    + "|".join(re.escape(domain) for domain in _GPT_DOMAINS_LC)
+    + r")(:[0-9]*)?([/?#]|$)"
+).replace('"', r"\x22")
+
+# ActivityWatch runs on localhost without TLS, proxies or auth, so talk to
+# it through a bare urllib3 connection pool rather than a requests.Session;
+# that skips most of the per-request overhead. HTTP/1.1 reuses the pooled
+# connections without a Connection header. The pool is thread-safe.
+_AW_POOL = urllib3.connection_from_url(
+    ACTIVITYWATCH_API_BASE,
+    maxsize=16,
+    retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                  raise_on_status=False),
 )
+_AW_BASE_PATH = urlsplit(ACTIVITYWATCH_API_BASE).path.rstrip("/")
+
+
+def close() -> None:
+    """Close the ActivityWatch connection pool."""
+    _AW_POOL.close()
 
 
+atexit.register(close)
+
+
+def _aw_request(method: str, path: str, params: Optional[dict] = None,
+                json_body=None, headers: Optional[dict] = None) -> urllib3.HTTPResponse:
+    """
+    Send a request to the ActivityWatch API and return the response.
+
+    Raises RuntimeError for error statuses (304 is passed through for
+    conditional GETs).
+    """
+    url = _AW_BASE_PATH + path
+    if params:
+        url += "?" + urlencode(params)
+    headers = dict(headers or {})
+    body = None
+    if json_body is not None:
+        body = json.dumps(json_body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+
+    response = _AW_POOL.urlopen(method, url, body=body, headers=headers)
+    if response.status >= 400:
+        # A bucket may have been removed or renamed; rediscover next time
+        invalidate_bucket_cache()
+        raise RuntimeError(f"ActivityWatch returned HTTP {response.status} for {path}")
+    return response
+
+
+@functools.lru_cache(maxsize=1)
 def get_buckets() -> dict:
-    """Get all buckets from ActivityWatch."""
-    response = requests.get(f"{ACTIVITYWATCH_API_BASE}/buckets/")
-    response.raise_for_status()
-    return response.json()
+    """
+    Get all buckets from ActivityWatch.
+
+    The result is cached for the lifetime of the process since bucket IDs
+    don't change between calls; use invalidate_bucket_cache() to refetch.
+    """
+    return _json_loads(_aw_request("GET", "/buckets/").data)
 
 
+@functools.lru_cache(maxsize=8)
 def find_bucket_by_prefix(prefix: str) -> Optional[str]:
     """Find a bucket by prefix."""
     buckets = get_buckets()
@@ -28,6 +126,12 @@ def find_bucket_by_prefix(prefix: str) -> Optional[str]:
     return None
 
 
+def invalidate_bucket_cache() -> None:
+    """Forget cached bucket lookups so the next call hits ActivityWatch again."""
+    get_buckets.cache_clear()
+    find_bucket_by_prefix.cache_clear()
+
+
 def find_window_bucket() -> Optional[str]:
     """Find the aw-watcher-window bucket for the current machine."""
     return find_bucket_by_prefix("aw-watcher-window_")
@@ -43,10 +147,90 @@ def find_web_bucket() -> Optional[str]:
     return find_bucket_by_prefix("aw-watcher-web-brave_localhost")
 
 
+def _open_event_cache() -> sqlite3.Connection:
+    """Open the on-disk event cache, creating the table if needed."""
+    conn = sqlite3.connect(EVENT_CACHE_FILE)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS events ("
+        " bucket TEXT NOT NULL,"
+        " date TEXT NOT NULL,"
+        " json_blob BLOB NOT NULL,"
+        " fetched_at TEXT NOT NULL,"
+        " PRIMARY KEY (bucket, date))"
+    )
+    return conn
+
+
+def _load_cached_events(bucket_id: str, date_str: str) -> Optional[List[dict]]:
+    """Load cached events for a bucket and date, or None on a cache miss."""
+    try:
+        with closing(_open_event_cache()) as conn:
+            row = conn.execute(
+                "SELECT json_blob FROM events WHERE bucket = ? AND date = ?",
+                (bucket_id, date_str),
+            ).fetchone()
+        if row is None:
+            return None
+        return _json_loads(gzip.decompress(row[0]))
+    except (sqlite3.Error, OSError, ValueError):
+        return None
+
+
+def _store_cached_events(bucket_id: str, date_str: str, events: List[dict]) -> None:
+    """Store events for a bucket and date; failures only cost a refetch."""
+    blob = gzip.compress(json.dumps(events).encode("utf-8"))
+    try:
+        with closing(_open_event_cache()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)",
+                (bucket_id, date_str, blob, datetime.now().isoformat()),
+            )
+    except sqlite3.Error:
+        pass
+
+
+def clear_event_cache() -> None:
+    """Drop all cached events."""
+    with closing(_open_event_cache()) as conn, conn:
+        conn.execute("DELETE FROM events")
+
+
+def cleanup_event_cache(keep_days: int = 30) -> None:
+    """Remove cached days older than keep_days to prevent unbounded growth."""
+    cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    try:
+        with closing(_open_event_cache()) as conn, conn:
+            conn.execute("DELETE FROM events WHERE date < ?", (cutoff,))
+    except sqlite3.Error:
+        pass
+
+
+def _day_bounds(date: datetime) -> Tuple[datetime, datetime]:
+    """
+    Naive [start, end) of the calendar day of date, as sent to ActivityWatch.
+
+    The bounds are sent labelled as UTC. An aware date contributes only its
+    wall-clock day; its offset is dropped.
+    """
+    start = date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    return start, start + timedelta(days=1)
+
+
+def is_day_complete(date: datetime) -> bool:
+    """Whether the ActivityWatch day of date has ended and settled."""
+    _, end = _day_bounds(date)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return end + timedelta(seconds=SETTLE_MARGIN_SEC) <= now
+
+
 def get_events_for_date(bucket_id: str, date: datetime) -> List[dict]:
     """
     Get all events from a bucket for a specific date.
     
+    Events for days that have already ended (see is_day_complete()) can't
+    change any more, so they are cached on disk (EVENT_CACHE_FILE) and
+    served from there on later calls. Other days are always fetched fresh.
+    
     Args:
         bucket_id: The bucket ID
         date: The date to get events for
@@ -54,18 +238,171 @@ def get_events_for_date(bucket_id: str, date: datetime) -> List[dict]:
     Returns:
         List of events
     """
-    start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    end = start + timedelta(days=1)
+    start, end = _day_bounds(date)
+    date_str = start.strftime("%Y-%m-%d")
+    is_past_day = is_day_complete(date)
+    
+    if is_past_day:
+        cached = _load_cached_events(bucket_id, date_str)
+        if cached is not None:
+            return cached
     
-    response = requests.get(
-        f"{ACTIVITYWATCH_API_BASE}/buckets/{bucket_id}/events",
-        params={
-            "start": start.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
-            "end": end.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
-        }
+    events = _fetch_events(bucket_id, start, end)
+    if is_past_day:
+        _store_cached_events(bucket_id, date_str, events)
+    return events
+
+
+def _aw_time(dt: datetime) -> str:
+    """
+    Format a datetime the way ActivityWatch query parameters expect.
+
+    Naive datetimes are sent as-is labelled UTC; aware ones are converted
+    to UTC first so the offset isn't duplicated next to the "Z".
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat(timespec="microseconds") + "Z"
+
+
+# Validators and payloads of recent event fetches, keyed on (bucket, start,
+# end), used to turn repeat fetches into conditional GETs. Kept in LRU order
+# and capped, since incremental fetches keep producing new ranges.
+_CONDITIONAL_CACHE: "OrderedDict[Tuple[str, str, str], Tuple[Optional[str], Optional[str], List[dict]]]" = OrderedDict()
+_CONDITIONAL_CACHE_SIZE = 16
+_CONDITIONAL_CACHE_LOCK = threading.Lock()
+
+
+def _fetch_events(bucket_id: str, start: datetime, end: datetime) -> List[dict]:
+    """
+    Fetch events in [start, end) from ActivityWatch.
+
+    If an earlier response for the same range carried an ETag or
+    Last-Modified header, the request is made conditional and a
+    304 Not Modified reuses the earlier payload without decoding a body.
+    """
+    params = {
+        "start": _aw_time(start),
+        "end": _aw_time(end),
+    }
+    key = (bucket_id, params["start"], params["end"])
+    with _CONDITIONAL_CACHE_LOCK:
+        cached = _CONDITIONAL_CACHE.get(key)
+        if cached:
+            _CONDITIONAL_CACHE.move_to_end(key)
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    response = _aw_request(
+        "GET", f"/buckets/{quote(bucket_id)}/events", params=params, headers=headers
     )
-    response.raise_for_status()
-    return response.json()
+    if response.status == 304 and cached:
+        return cached[2]
+
+    events = _json_loads(response.data)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        with _CONDITIONAL_CACHE_LOCK:
+            _CONDITIONAL_CACHE[key] = (etag, last_modified, events)
+            _CONDITIONAL_CACHE.move_to_end(key)
+            while len(_CONDITIONAL_CACHE) > _CONDITIONAL_CACHE_SIZE:
+                _CONDITIONAL_CACHE.popitem(last=False)
+    return events
+
+
+# Events pre-parsed into parallel lists, sorted by start: starts/ends are
+# epoch seconds and events holds the original dicts, all in the same order
+EventsSoA = namedtuple("EventsSoA", "starts ends events")
+
+# Sorted, disjoint time intervals as parallel lists of epoch seconds
+Intervals = namedtuple("Intervals", "starts ends")
+
+# Not-afk intervals separated by at most this many seconds are merged; this
+# absorbs the small gaps between consecutive AFK watcher heartbeats
+NOT_AFK_MERGE_SLACK_SEC = 1
+
+
+def _parse_timestamp(ts: str) -> float:
+    """Parse an ActivityWatch ISO-8601 timestamp into epoch seconds."""
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+
+
+def _parse_events(events: List[dict]) -> EventsSoA:
+    """
+    Parse events once into an EventsSoA, oldest first.
+
+    Events without a timestamp or with a non-positive duration are dropped.
+    """
+    parsed = []
+    for event in events:
+        try:
+            ts = event["timestamp"]
+            duration = event["duration"]
+        except KeyError:
+            continue
+        if not ts or duration <= 0:
+            continue
+        start = _parse_timestamp(ts)
+        parsed.append((start, start + duration, event))
+
+    # ActivityWatch returns newest first; the sort is stable so events with
+    # equal timestamps keep their relative order
+    parsed.sort(key=lambda x: x[0])
+    return EventsSoA(
+        [p[0] for p in parsed],
+        [p[1] for p in parsed],
+        [p[2] for p in parsed],
+    )
+
+
+def _merge_intervals(intervals: List[Tuple[float, float]], slack: float = 0) -> Intervals:
+    """
+    Merge (start, end) pairs sorted by start into disjoint Intervals.
+
+    Pairs overlapping or separated by at most slack seconds are combined.
+    """
+    starts = []
+    ends = []
+    for start, end in intervals:
+        if ends and start <= ends[-1] + slack:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return Intervals(starts, ends)
+
+
+def _parse_afk_events(events: List[dict]) -> Tuple[Intervals, float]:
+    """
+    Extract not-afk intervals and total not-afk seconds from AFK events.
+
+    Both are built in the same loop so callers needing screen time and
+    intervals only walk and parse the AFK events once. Adjacent and
+    overlapping intervals are merged, so the returned Intervals are sorted
+    and disjoint.
+    """
+    intervals = []
+    total_seconds = 0
+    for event in events:
+        try:
+            if event["data"]["status"] != "not-afk":
+                continue
+            ts = event["timestamp"]
+            duration = event["duration"]
+        except KeyError:
+            continue
+        start = _parse_timestamp(ts)
+        intervals.append((start, start + duration))
+        total_seconds += duration
+
+    intervals.sort(key=lambda x: x[0])
+    return _merge_intervals(intervals, NOT_AFK_MERGE_SLACK_SEC), total_seconds
 
 
 def get_not_afk_intervals(date: datetime) -> List[Tuple[datetime, datetime]]:
@@ -78,29 +415,51 @@ def get_not_afk_intervals(date: datetime) -> List[Tuple[datetime, datetime]]:
     if not afk_bucket:
         return []
 
-    events = get_events_for_date(afk_bucket, date)
-    intervals = []
-    for event in events:
-        if event.get("data", {}).get("status") == "not-afk":
-            start = datetime.fromisoformat(event["timestamp"].replace("Z", "+00:00"))
-            duration = event.get("duration", 0)
-            end = start + timedelta(seconds=duration)
-            intervals.append((start, end))
+    intervals, _ = _parse_afk_events(get_events_for_date(afk_bucket, date))
+    return [
+        (datetime.fromtimestamp(start, timezone.utc), datetime.fromtimestamp(end, timezone.utc))
+        for start, end in zip(intervals.starts, intervals.ends)
+    ]
 
-    intervals.sort(key=lambda x: x[0])
-    return intervals
 
+def _overlap_sum(ev_starts: List[float], ev_ends: List[float],
+                 intv_starts: List[float], intv_ends: List[float]) -> List[float]:
+    """
+    Seconds each event overlaps with a set of intervals.
 
-def _overlap_seconds(ev_start: datetime, ev_end: datetime,
-                     intervals: List[Tuple[datetime, datetime]]) -> float:
-    """Calculate total seconds an event overlaps with not-afk intervals."""
-    total = 0.0
-    for intv_start, intv_end in intervals:
-        overlap_start = max(ev_start, intv_start)
-        overlap_end = min(ev_end, intv_end)
-        if overlap_start < overlap_end:
-            total += (overlap_end - overlap_start).total_seconds()
-    return total
+    Two-pointer sweep: events must be sorted by start and intervals sorted
+    and disjoint. The interval pointer only moves forward, so the whole
+    sweep is O(events + intervals + overlaps).
+    """
+    totals = []
+    n_intervals = len(intv_starts)
+    first = 0
+    for ev_start, ev_end in zip(ev_starts, ev_ends):
+        # Skip intervals that ended before this (and so every later) event
+        while first < n_intervals and intv_ends[first] <= ev_start:
+            first += 1
+        total = 0.0
+        i = first
+        while i < n_intervals and intv_starts[i] < ev_end:
+            total += min(ev_end, intv_ends[i]) - max(ev_start, intv_starts[i])
+            i += 1
+        totals.append(total)
+    return totals
+
+
+def _filter_parsed_by_not_afk(parsed: EventsSoA, not_afk: Intervals) -> List[dict]:
+    """Core of filter_events_by_not_afk() on pre-parsed events and intervals."""
+    if not not_afk.starts:
+        return []
+
+    filtered = []
+    active = _overlap_sum(parsed.starts, parsed.ends, not_afk.starts, not_afk.ends)
+    for active_secs, event in zip(active, parsed.events):
+        if active_secs > 0:
+            new_event = dict(event)
+            new_event["duration"] = active_secs
+            filtered.append(new_event)
+    return filtered
 
 
 def filter_events_by_not_afk(events: List[dict],
@@ -108,25 +467,126 @@ def filter_events_by_not_afk(events: List[dict],
     """
     Filter events to only include time overlapping with not-afk intervals.
 
-    Returns new event list with adjusted durations (AFK time excluded).
+    Returns new event list with adjusted durations (AFK time excluded),
+    sorted oldest first.
     """
     if not not_afk_intervals:
         return []
 
-    filtered = []
-    for event in events:
-        ts = event.get("timestamp", "")
-        duration = event.get("duration", 0)
-        if not ts or duration <= 0:
+    not_afk = _merge_intervals(sorted(
+        (start.timestamp(), end.timestamp()) for start, end in not_afk_intervals
+    ))
+    return _filter_parsed_by_not_afk(_parse_events(events), not_afk)
+
+
+def get_window_events_since(date: datetime, fetch_from: float, since: float,
+                            settled_before: float) -> Tuple[List[dict], List[dict], float]:
+    """
+    Get a day's not-afk window events that end after since (epoch seconds).
+
+    Used to analyze the current day incrementally. Events are fetched from
+    fetch_from, which must be at or before the start of every event ending
+    after since: the server trims events to the requested start, so an
+    event spanning it would otherwise come back cut short.
+
+    Returns (settled, live, resume_from). settled holds the leading events
+    that ended at or before settled_before and won't change any more, live
+    the rest; both are oldest first with durations trimmed to not-afk
+    time, like filter_events_by_not_afk(). resume_from is the fetch_from to
+    use on the next call: the start of the first unsettled event, or
+    settled_before if there is none.
+    """
+    window_bucket = find_window_bucket()
+    afk_bucket = find_afk_bucket()
+    if not window_bucket or not afk_bucket:
+        return [], [], fetch_from
+
+    day_start, day_end = _day_bounds(date)
+
+    def utc_naive(ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+    parsed = _parse_events(_fetch_events(window_bucket, max(day_start, utc_naive(fetch_from)), day_end))
+    if not parsed.starts:
+        return [], [], max(fetch_from, settled_before)
+    # Only AFK events overlapping the fetched window events matter
+    not_afk, _ = _parse_afk_events(
+        _fetch_events(afk_bucket, max(day_start, utc_naive(parsed.starts[0])), day_end)
+    )
+
+    settled = []
+    live = []
+    resume_from = None
+    active = _overlap_sum(parsed.starts, parsed.ends, not_afk.starts, not_afk.ends)
+    for start, end, active_secs, event in zip(parsed.starts, parsed.ends, active, parsed.events):
+        if end <= since:
             continue
-        ev_start = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        ev_end = ev_start + timedelta(seconds=duration)
-        active_secs = _overlap_seconds(ev_start, ev_end, not_afk_intervals)
+        if resume_from is None and end > settled_before:
+            # Keep order: everything from the first unsettled event on is live
+            resume_from = start
         if active_secs > 0:
             new_event = dict(event)
             new_event["duration"] = active_secs
-            filtered.append(new_event)
-    return filtered
+            (settled if resume_from is None else live).append(new_event)
+    if resume_from is None:
+        resume_from = max(fetch_from, settled_before)
+    return settled, live, resume_from
+
+
+def _social_seconds(events: List[dict]) -> float:
+    """Sum the duration of window events belonging to social network apps."""
+    total_seconds = 0
+    for event in events:
+        try:
+            app = event["data"]["app"].lower()
+            duration = event["duration"]
+        except (KeyError, AttributeError):
+            continue
+        if app in _SOCIAL_APPS_EXACT or _SOCIAL_RE.search(app):
+            total_seconds += duration
+    return total_seconds
+
+
+@functools.lru_cache(maxsize=8192)
+def _url_host(url: str) -> str:
+    """
+    Extract the lowercased host from a URL.
+
+    A cheap stand-in for urlparse(url).hostname: takes everything between
+    "://" and the next "/", "?" or "#", then drops credentials and port.
+    Memoized, since browsing events repeat the same URLs many times a day.
+    """
+    start = url.find("://")
+    if start == -1:
+        return ""
+    start += 3
+    end = len(url)
+    for sep in "/?#":
+        pos = url.find(sep, start, end)
+        if pos != -1:
+            end = pos
+    netloc = url[start:end].rpartition("@")[2]
+    return netloc.partition(":")[0].lower()
+
+
+def _is_gpt_domain(host: str) -> bool:
+    """Check whether a host is one of GPT_DOMAINS or a subdomain of one."""
+    return host in _GPT_DOMAINS_EXACT or host.endswith(_GPT_DOMAIN_SUFFIXES)
+
+
+def _gpt_seconds(events: List[dict]) -> float:
+    """Sum the duration of web events on AI/GPT domains."""
+    total_seconds = 0
+    for event in events:
+        try:
+            url = event["data"]["url"]
+            duration = event["duration"]
+        except KeyError:
+            continue
+        # Skip malformed events (e.g. "url": null) instead of failing the day
+        if isinstance(url, str) and _is_gpt_domain(_url_host(url)):
+            total_seconds += duration
+    return total_seconds
 
 
 def get_screen_time_for_date(date: datetime) -> float:
@@ -147,14 +607,48 @@ def get_screen_time_for_date(date: datetime) -> float:
     events = get_events_for_date(afk_bucket, date)
     
     # Sum up duration of "not-afk" events
-    total_seconds = 0
-    for event in events:
-        if event.get("data", {}).get("status") == "not-afk":
-            total_seconds += event.get("duration", 0)
+    _, total_seconds = _parse_afk_events(events)
     
     return round(total_seconds / 60)  # Convert to minutes
 
 
+def _query(statements: List[str], start: datetime, end: datetime):
+    """Run an ActivityWatch query over [start, end) and return its result."""
+    response = _aw_request("POST", "/query/", json_body={
+        "query": statements,
+        "timeperiods": [f"{_aw_time(start)}/{_aw_time(end)}"],
+    })
+    return _json_loads(response.data)[0]
+
+
+def _query_not_afk_seconds(date: datetime, afk_bucket: str, bucket_id: str,
+                           key: str, regex: str) -> float:
+    """
+    Total not-afk seconds of a bucket's events whose data[key] matches regex.
+
+    Filtering and the intersection with not-afk time happen server-side in
+    ActivityWatch, so only the resulting total is transferred.
+
+    This mirrors what compute_daily_stats() does client-side: the data
+    bucket's events are used as-is, and only the AFK events are flooded so
+    that overlapping heartbeats don't count twice. One difference remains:
+    flood() closes gaps of up to ActivityWatch's pulsetime (5 s) between
+    AFK events, where the client merges not-afk intervals at most
+    NOT_AFK_MERGE_SLACK_SEC apart. Totals can therefore differ by a few
+    seconds per AFK transition.
+    """
+    start, end = _day_bounds(date)
+    result = _query([
+        f'afk = flood(query_bucket("{afk_bucket}"));',
+        'not_afk = filter_keyvals(afk, "status", ["not-afk"]);',
+        f'events = query_bucket("{bucket_id}");',
+        f'events = filter_keyvals_regex(events, "{key}", "{regex}");',
+        "events = filter_period_intersect(events, not_afk);",
+        "RETURN = sum_durations(events);",
+    ], start, end)
+    return float(result)
+
+
 def get_social_time_for_date(date: datetime) -> float:
     """
     Get time spent on social network apps (Telegram, etc.) for a specific date.
@@ -170,17 +664,13 @@ def get_social_time_for_date(date: datetime) -> float:
     if not window_bucket:
         raise RuntimeError("Could not find window bucket")
     
-    events = get_events_for_date(window_bucket, date)
-    not_afk = get_not_afk_intervals(date)
-    events = filter_events_by_not_afk(events, not_afk)
-    total_seconds = 0
-    for event in events:
-        app = event.get("data", {}).get("app", "").lower()
-        for social_app in SOCIAL_APPS:
-            if social_app.lower() in app:
-                total_seconds += event.get("duration", 0)
-                break
+    afk_bucket = find_afk_bucket()
+    if not afk_bucket:
+        return 0
     
+    total_seconds = _query_not_afk_seconds(
+        date, afk_bucket, window_bucket, "app", _SOCIAL_QUERY_REGEX
+    )
     return round(total_seconds / 60)  # Convert to minutes
 
 
@@ -200,39 +690,114 @@ def get_gpt_time_for_date(date: datetime) -> float:
         # No web bucket, return 0
         return 0
     
-    events = get_events_for_date(web_bucket, date)
-    not_afk = get_not_afk_intervals(date)
-    events = filter_events_by_not_afk(events, not_afk)
-    
-    # Sum up duration of GPT domain events
-    total_seconds = 0
-    for event in events:
-        url = event.get("data", {}).get("url", "")
-        try:
-            domain = urlparse(url).netloc.lower()
-            for gpt_domain in GPT_DOMAINS:
-                if gpt_domain.lower() in domain:
-                    total_seconds += event.get("duration", 0)
-                    break
-        except Exception:
-            pass
+    afk_bucket = find_afk_bucket()
+    if not afk_bucket:
+        return 0
     
+    total_seconds = _query_not_afk_seconds(
+        date, afk_bucket, web_bucket, "url", _GPT_URL_QUERY_REGEX
+    )
     return round(total_seconds / 60)  # Convert to minutes
 
 
+def _fetch_all(date: datetime, bucket_ids: List[Optional[str]]) -> List[List[dict]]:
+    """
+    Fetch a date's events from several buckets concurrently.
+
+    The fetches don't depend on each other, so their round trips overlap.
+    Returns one event list per bucket ID, in order; None IDs yield [].
+    """
+    with ThreadPoolExecutor(max_workers=len(bucket_ids)) as executor:
+        futures = [
+            executor.submit(get_events_for_date, bucket_id, date) if bucket_id else None
+            for bucket_id in bucket_ids
+        ]
+        return [future.result() if future else [] for future in futures]
+
+
+def compute_daily_stats(date: datetime) -> dict:
+    """
+    Compute screen, social and GPT time for a date in one go.
+
+    Each bucket is fetched once (all three concurrently) and the AFK events
+    are parsed once, instead of every get_*_time_for_date() call refetching
+    them on its own.
+
+    Only the AFK bucket is required; without a window or web bucket the
+    matching totals are 0 (and "window_events" is empty).
+
+    Returns:
+        Dict with "screen_time", "social_time" and "gpt_time" in minutes,
+        plus "window_events" (the AFK-filtered window events, for focus
+        analysis)
+    """
+    afk_bucket = find_afk_bucket()
+    if not afk_bucket:
+        raise RuntimeError("Could not find AFK bucket")
+
+    window_bucket = find_window_bucket()
+    web_bucket = find_web_bucket()
+
+    afk_events, window_events, web_events = _fetch_all(
+        date, [afk_bucket, window_bucket, web_bucket]
+    )
+
+    not_afk, screen_seconds = _parse_afk_events(afk_events)
+
+    window_events = _filter_parsed_by_not_afk(_parse_events(window_events), not_afk)
+    web_events = _filter_parsed_by_not_afk(_parse_events(web_events), not_afk)
+
+    return {
+        "screen_time": round(screen_seconds / 60),
+        "social_time": round(_social_seconds(window_events) / 60),
+        "gpt_time": round(_gpt_seconds(web_events) / 60),
+        "window_events": window_events,
+    }
+
+
+# Today's minute totals from compute_daily_stats() for get_today_stats():
+# (day, time.monotonic() when computed, totals)
+_TODAY_STATS: Optional[Tuple[date_type, float, dict]] = None
+
+
+def get_today_stats(fresh_within_sec: float = 60) -> dict:
+    """
+    Get today's screen, social and GPT time in minutes from one
+    compute_daily_stats() pass.
+
+    The totals are reused if they were computed less than fresh_within_sec
+    seconds ago, so reading them one after another doesn't refetch every
+    bucket; pass 0 to always recompute.
+
+    Returns:
+        Dict with "screen_time", "social_time" and "gpt_time"
+    """
+    global _TODAY_STATS
+    day = datetime.now().date()
+    now = time.monotonic()
+    cached = _TODAY_STATS
+    if cached is not None and cached[0] == day and now - cached[1] < fresh_within_sec:
+        return cached[2]
+    stats = compute_daily_stats(datetime.combine(day, datetime.min.time()))
+    # Keep only the totals; the window events aren't needed here
+    totals = {key: stats[key] for key in ("screen_time", "social_time", "gpt_time")}
+    _TODAY_STATS = (day, now, totals)
+    return totals
+
+
 def get_today_screen_time() -> float:
     """Get screen time for today in minutes."""
     return get_screen_time_for_date(datetime.now())
 
 
-def get_today_social_time() -> float:
-    """Get social time for today in minutes."""
-    return get_social_time_for_date(datetime.now())
+def get_today_social_time(fresh_within_sec: float = 60) -> float:
+    """Get social time for today in minutes (see get_today_stats())."""
+    return get_today_stats(fresh_within_sec)["social_time"]
 
 
-def get_today_gpt_time() -> float:
-    """Get GPT time for today in minutes."""
-    return get_gpt_time_for_date(datetime.now())
+def get_today_gpt_time(fresh_within_sec: float = 60) -> float:
+    """Get GPT time for today in minutes (see get_today_stats())."""
+    return get_today_stats(fresh_within_sec)["gpt_time"]
 
 
 if __name__ == "__main__":
@@ -251,16 +816,17 @@ if __name__ == "__main__":
         print(f"Window bucket: {window_bucket}")
         print(f"Web bucket: {web_bucket}")
         
-        screen_time = get_today_screen_time()
-        social_time = get_today_social_time()
-        gpt_time = get_today_gpt_time()
+        stats = get_today_stats()
+        screen_time = stats["screen_time"]
+        social_time = stats["social_time"]
+        gpt_time = stats["gpt_time"]
         
         print(f"\nToday's stats:")
         print(f"  Screen time: {screen_time} min ({screen_time/60:.1f} hours)")
         print(f"  Social time: {social_time} min ({social_time/60:.1f} hours)")
         print(f"  GPT/AI time: {gpt_time} min ({gpt_time/60:.1f} hours)")
         
-    except requests.exceptions.ConnectionError:
+    except urllib3.exceptions.MaxRetryError:
         print("Error: Could not connect to ActivityWatch. Is it running?")
     except Exception as e:
         print(f"Error: {e}")
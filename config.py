@@ -58,5 +58,20 @@ FOCUS_SCORE_K = 0.05
 import os as _os
 SYNC_STATE_FILE = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "sync_state.json")
 
+# Path to the stored incremental focus analysis of the current day
+FOCUS_STATE_FILE = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "focus_state.json")
+
 # Number of past days to check for missed syncs during automatic backfill
 BACKFILL_DAYS = 7
+
+# --- Event Cache Configuration ---
+
+# Path to the on-disk cache of ActivityWatch events for completed days
+EVENT_CACHE_FILE = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "aw_cache.sqlite")
+
+# Events that ended at least this long ago are treated as final (seconds):
+# a day only counts as complete, and cacheable, this long after it ended, and
+# today's focus analysis stops reprocessing older events. Must exceed the AFK
+# watcher timeout (3 minutes by default), which can end a not-afk period
+# retroactively, and leave time for late heartbeats.
+SETTLE_MARGIN_SEC = 600
@@ -1,8 +1,18 @@
 """Client for pushing data to Exist.io API."""
 
+import atexit
 import requests
 from datetime import datetime
+from types import MappingProxyType
 from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Use orjson for response decoding when available, else the stdlib
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 from config import (
     EXIST_ACCESS_TOKEN,
@@ -13,71 +23,95 @@ from config import (
     EXIST_FOCUS_SCORE_ATTR,
 )
 
-# All attributes we manage
-MANAGED_ATTRIBUTES = [
-    {
+# All attributes we manage (read-only)
+MANAGED_ATTRIBUTES = (
+    MappingProxyType({
         "name": EXIST_SCREEN_TIME_ATTR,
         "label": "Screen Time",
         "group": "productivity",
         "value_type": 3,  # Period in minutes
-    },
-    {
+    }),
+    MappingProxyType({
         "name": EXIST_SOCIAL_ATTR,
         "label": "Social Networks",
         "group": "social",
         "value_type": 3,  # Period in minutes
-    },
-    {
+    }),
+    MappingProxyType({
         "name": EXIST_GPT_ATTR,
         "label": "AI Assistants",
         "group": "productivity",
         "value_type": 3,  # Period in minutes
-    },
-    {
+    }),
+    MappingProxyType({
         "name": EXIST_FOCUS_SCORE_ATTR,
         "label": "Focus Score",
         "group": "productivity",
         "value_type": 0,  # Integer (0-100 scale)
-    },
-]
+    }),
+)
+
+# Authorization headers for Exist.io API, set once on the shared session
+_HEADERS = {
+    "Authorization": f"Bearer {EXIST_ACCESS_TOKEN}",
+    "Content-Type": "application/json"
+}
+
+# Shared session so consecutive calls reuse the same TLS connection
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.headers.update(_HEADERS)
+
 
+def close() -> None:
+    """Close the shared HTTP session and its pooled connections."""
+    _SESSION.close()
 
-def get_headers() -> dict:
-    """Get authorization headers for Exist.io API."""
-    return {
-        "Authorization": f"Bearer {EXIST_ACCESS_TOKEN}",
-        "Content-Type": "application/json"
-    }
+
+atexit.register(close)
 
 
 def get_user_profile() -> dict:
     """Get the authenticated user's profile."""
-    response = requests.get(
-        f"{EXIST_API_BASE}/accounts/profile/",
-        headers=get_headers()
-    )
+    response = _SESSION.get(f"{EXIST_API_BASE}/accounts/profile/")
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def get_attributes() -> List[dict]:
     """Get all attributes for the user."""
-    response = requests.get(
-        f"{EXIST_API_BASE}/attributes/",
-        headers=get_headers()
-    )
+    response = _SESSION.get(f"{EXIST_API_BASE}/attributes/")
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def get_owned_attributes() -> List[dict]:
     """Get attributes owned by our service."""
-    response = requests.get(
-        f"{EXIST_API_BASE}/attributes/owned/",
-        headers=get_headers()
+    response = _SESSION.get(f"{EXIST_API_BASE}/attributes/owned/")
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+
+def create_attributes_bulk(attrs: List[dict]) -> dict:
+    """
+    Create several custom attributes in a single request.
+    
+    Args:
+        attrs: List of dicts with name, label, group, value_type and manual
+               (see create_attribute)
+    """
+    response = _SESSION.post(
+        f"{EXIST_API_BASE}/attributes/create/",
+        json=attrs
     )
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def create_attribute(
@@ -97,19 +131,27 @@ def create_attribute(
         value_type: 0=integer, 1=float, 3=period(minutes)
         manual: Whether this is a manual entry attribute
     """
-    response = requests.post(
-        f"{EXIST_API_BASE}/attributes/create/",
-        headers=get_headers(),
-        json=[{
-            "name": name,
-            "label": label,
-            "group": group,
-            "value_type": value_type,
-            "manual": manual
-        }]
+    return create_attributes_bulk([{
+        "name": name,
+        "label": label,
+        "group": group,
+        "value_type": value_type,
+        "manual": manual
+    }])
+
+
+def acquire_attribute_bulk(names: List[str]) -> dict:
+    """
+    Acquire ownership of several attributes in a single request.
+    
+    This must be done before updating values.
+    """
+    response = _SESSION.post(
+        f"{EXIST_API_BASE}/attributes/acquire/",
+        json=[{"name": name} for name in names]
     )
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def acquire_attribute(name: str) -> dict:
@@ -118,13 +160,22 @@ def acquire_attribute(name: str) -> dict:
     
     This must be done before updating values.
     """
-    response = requests.post(
-        f"{EXIST_API_BASE}/attributes/acquire/",
-        headers=get_headers(),
-        json=[{"name": name}]
+    return acquire_attribute_bulk([name])
+
+
+def update_attributes_bulk(updates: List[dict]) -> dict:
+    """
+    Update several attribute values in a single request.
+    
+    Args:
+        updates: List of dicts with name, date (YYYY-MM-DD) and value
+    """
+    response = _SESSION.post(
+        f"{EXIST_API_BASE}/attributes/update/",
+        json=updates
     )
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def update_attribute(name: str, date: str, value: int) -> dict:
@@ -136,40 +187,43 @@ def update_attribute(name: str, date: str, value: int) -> dict:
         date: Date in YYYY-MM-DD format
         value: The value to set
     """
-    response = requests.post(
-        f"{EXIST_API_BASE}/attributes/update/",
-        headers=get_headers(),
-        json=[{
-            "name": name,
-            "date": date,
-            "value": value
-        }]
-    )
-    response.raise_for_status()
-    return response.json()
+    return update_attributes_bulk([{
+        "name": name,
+        "date": date,
+        "value": value
+    }])
 
 
-def ensure_attribute(attr_config: dict) -> bool:
+def get_owned_attribute_names() -> set:
+    """Get the names of attributes owned by our service (empty on error)."""
+    try:
+        owned = get_owned_attributes()
+    except Exception:
+        return set()
+    results = owned.get("results", []) if isinstance(owned, dict) else owned
+    if not isinstance(results, list):
+        return set()
+    return {attr.get("name") for attr in results if isinstance(attr, dict)}
+
+
+def ensure_attribute(attr_config: dict, owned_names: Optional[set] = None) -> bool:
     """
     Ensure an attribute exists and is owned by us.
     
     Args:
         attr_config: Dict with name, label, group, value_type
+        owned_names: Names we already own, from get_owned_attribute_names();
+                     fetched here if not given
         
     Returns True if successful.
     """
     name = attr_config["name"]
     
     # First check if we already own it
-    try:
-        owned = get_owned_attributes()
-        results = owned.get("results", []) if isinstance(owned, dict) else owned
-        if isinstance(results, list):
-            for attr in results:
-                if isinstance(attr, dict) and attr.get("name") == name:
-                    return True
-    except Exception:
-        pass
+    if owned_names is None:
+        owned_names = get_owned_attribute_names()
+    if name in owned_names:
+        return True
     
     # Try to acquire existing attribute first
     try:
@@ -208,6 +262,16 @@ def ensure_attribute(attr_config: dict) -> bool:
         return False
 
 
+def _result_name(entry) -> Optional[str]:
+    """Get the attribute name from a success/failed entry in an API response."""
+    return entry.get("name") if isinstance(entry, dict) else entry
+
+
+def _result_names(entries: List) -> set:
+    """Get the attribute names from a list of success/failed entries."""
+    return {_result_name(entry) for entry in entries}
+
+
 def ensure_all_attributes() -> bool:
     """
     Ensure all managed attributes exist and are owned by us.
@@ -216,9 +280,61 @@ def ensure_all_attributes() -> bool:
     """
     print("Setting up Exist.io attributes...")
     all_ok = True
-    for attr_config in MANAGED_ATTRIBUTES:
-        if not ensure_attribute(attr_config):
+    
+    # One ownership lookup covers every attribute; usually that's all we need
+    owned_names = get_owned_attribute_names()
+    missing = [a for a in MANAGED_ATTRIBUTES if a["name"] not in owned_names]
+    if not missing:
+        return True
+    
+    # Try to acquire the rest at once; anything not found gets created
+    to_create = missing
+    try:
+        result = acquire_attribute_bulk([a["name"] for a in missing])
+        not_acquired = _result_names(result.get("failed", []))
+        to_create = [a for a in missing if a["name"] in not_acquired]
+        for attr in missing:
+            if attr["name"] not in not_acquired:
+                print(f"  Acquired: {attr['name']}")
+    except requests.exceptions.HTTPError:
+        pass
+    
+    if not to_create:
+        return True
+    
+    try:
+        result = create_attributes_bulk([
+            {
+                "name": a["name"],
+                "label": a["label"],
+                "group": a["group"],
+                "value_type": a["value_type"],
+                "manual": False,
+            }
+            for a in to_create
+        ])
+        not_created = _result_names(result.get("failed", []))
+        for entry in result.get("failed", []):
+            print(f"  Failed to create {_result_name(entry)}: {entry}")
             all_ok = False
+        
+        # Now acquire the newly created attributes
+        created = [a["name"] for a in to_create if a["name"] not in not_created]
+        if created:
+            result = acquire_attribute_bulk(created)
+            not_acquired = _result_names(result.get("failed", []))
+            for name in created:
+                if name in not_acquired:
+                    print(f"  Failed to acquire {name}: {result}")
+                    all_ok = False
+                else:
+                    print(f"  Created and acquired: {name}")
+    except requests.exceptions.HTTPError as e:
+        print(f"  Error creating attributes: {e}")
+        if hasattr(e, 'response'):
+            print(f"    Response: {e.response.text}")
+        return False
+    
     return all_ok
 
 
@@ -238,6 +354,27 @@ def push_attribute_value(name: str, minutes: int, date: Optional[datetime] = Non
     return update_attribute(name, date_str, minutes)
 
 
+def push_daily_stats(stats: dict, date: Optional[datetime] = None) -> dict:
+    """
+    Push all daily metrics to Exist.io in a single request.
+    
+    Args:
+        stats: Dict with screen_time, social_time, gpt_time (minutes)
+               and focus_score (0-100)
+        date: Date to update (defaults to today)
+    """
+    if date is None:
+        date = datetime.now()
+    
+    date_str = date.strftime("%Y-%m-%d")
+    return update_attributes_bulk([
+        {"name": EXIST_SCREEN_TIME_ATTR, "date": date_str, "value": stats["screen_time"]},
+        {"name": EXIST_SOCIAL_ATTR, "date": date_str, "value": stats["social_time"]},
+        {"name": EXIST_GPT_ATTR, "date": date_str, "value": stats["gpt_time"]},
+        {"name": EXIST_FOCUS_SCORE_ATTR, "date": date_str, "value": stats["focus_score"]},
+    ])
+
+
 def push_screen_time(minutes: int, date: Optional[datetime] = None) -> dict:
     """Push screen time value to Exist.io."""
     return push_attribute_value(EXIST_SCREEN_TIME_ATTR, minutes, date)
@@ -10,29 +10,50 @@ Score 100 = Deep focus, minimal switching
 Score 0 = Constant context switching, fragmented attention
 """
 
+import functools
 import math
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+import statistics
+import time
+from collections import defaultdict, namedtuple
+from itertools import islice
+from operator import itemgetter
+from datetime import date as date_type, datetime, timedelta
+from typing import List, Dict, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
 from activitywatch_client import (
     get_events_for_date,
+    get_window_events_since,
+    is_day_complete,
     find_window_bucket,
     get_not_afk_intervals,
     filter_events_by_not_afk,
 )
+from sync_state import load_focus_partial, save_focus_partial
 
 from config import (
     NOISE_THRESHOLD_SEC,
     DEEP_WORK_THRESHOLD_MIN,
     FRAGMENTATION_THRESHOLD_MIN,
     FOCUS_SCORE_K,
+    SETTLE_MARGIN_SEC,
 )
 
 
-@dataclass
+@dataclass(frozen=True)
 class FocusMetrics:
     """Container for focus analysis results."""
+    
+    # Declared by hand rather than with dataclass(slots=True) (3.10+)
+    __slots__ = (
+        "median_session_min",
+        "switches_per_hour",
+        "shannon_entropy",
+        "total_sessions",
+        "total_time_min",
+        "focus_score",
+    )
+    
     median_session_min: float
     switches_per_hour: float
     shannon_entropy: float
@@ -40,6 +61,15 @@ class FocusMetrics:
     total_time_min: float
     focus_score: int  # 0-100
     
+    # Frozen slotted dataclasses can't be copied or unpickled by default
+    # (the restore goes through the blocked __setattr__), so do it by hand
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+    
     def __str__(self):
         return (
             f"Focus Score: {self.focus_score}/100\n"
@@ -50,8 +80,17 @@ class FocusMetrics:
         )
 
 
+# De-bounced sessions as parallel lists: apps[i] was used for durations[i]
+# seconds, oldest session first
+Sessions = namedtuple("Sessions", "apps durations")
+
+
 def get_window_events_for_date(date: datetime) -> List[dict]:
-    """Get window events for a specific date, filtered to exclude AFK time."""
+    """
+    Get window events for a specific date, filtered to exclude AFK time.
+    
+    Events are returned oldest first.
+    """
     bucket = find_window_bucket()
     if not bucket:
         return []
@@ -60,9 +99,13 @@ def get_window_events_for_date(date: datetime) -> List[dict]:
     return filter_events_by_not_afk(events, not_afk)
 
 
-def debounce_events(events: List[dict], noise_threshold_sec: float = None) -> List[dict]:
+def debounce_events(
+    events: List[dict],
+    noise_threshold_sec: float = None,
+    presorted: bool = False,
+) -> Sessions:
     """
-    De-bounce events to filter noise.
+    De-bounce events into Sessions, filtering noise.
     
     Merges consecutive events of the same app and filters out
     micro-switches (< threshold seconds).
@@ -71,57 +114,108 @@ def debounce_events(events: List[dict], noise_threshold_sec: float = None) -> Li
         [VS Code, 5s] -> [Chrome, 2s] -> [VS Code, 10m]
         becomes:
         [VS Code, 10m 7s]  (Chrome was just noise)
+    
+    Pass presorted=True if events are already ordered oldest first (as
+    returned by filter_events_by_not_afk() and compute_daily_stats()) to
+    skip the sort.
     """
     if noise_threshold_sec is None:
         noise_threshold_sec = NOISE_THRESHOLD_SEC
     
-    if not events:
-        return []
-    
-    # Sort by timestamp (oldest first)
-    sorted_events = sorted(events, key=lambda e: e.get("timestamp", ""))
+    rows = _session_rows(events)
+    if not presorted:
+        # Oldest first; stable for equal timestamps
+        rows.sort(key=itemgetter(0))
+    return _finish_debounce(_advance_debounce(None, rows, noise_threshold_sec), noise_threshold_sec)
+
+
+# Debounce progress after a prefix of the rows: the sessions emitted so far
+# as parallel lists, the (app, duration) session being built and the
+# (app, duration) run right after it, or None if there is no such run yet
+_DebounceState = namedtuple("_DebounceState", "apps durations current pending")
+
+
+def _session_rows(events: List[dict]) -> List[Tuple[str, str, float]]:
+    """Pull out (timestamp, app, duration) once per event."""
+    no_data = {}
+    return [
+        (e.get("timestamp", ""), e.get("data", no_data).get("app", "unknown"), e.get("duration", 0))
+        for e in events
+    ]
+
+
+def _advance_debounce(
+    state: Optional[_DebounceState],
+    rows: List[Tuple[str, str, float]],
+    threshold: float,
+) -> Optional[_DebounceState]:
+    """
+    Feed more rows, oldest first, through the debounce state machine.
     
-    # First pass: merge consecutive same-app events
-    merged = []
-    for event in sorted_events:
-        app = event.get("data", {}).get("app", "unknown")
-        duration = event.get("duration", 0)
-        
-        if merged and merged[-1]["app"] == app:
-            merged[-1]["duration"] += duration
-        else:
-            merged.append({"app": app, "duration": duration})
-    
-    # Second pass: absorb noise (short events between same-app events)
-    # If we have A -> B -> A where B is short, merge into A
-    cleaned = []
-    i = 0
-    while i < len(merged):
-        current = merged[i].copy()
-        
-        # Look ahead for pattern: current -> short_noise -> same_as_current
-        while i + 2 < len(merged):
-            noise = merged[i + 1]
-            next_same = merged[i + 2]
-            
-            if (noise["duration"] < noise_threshold_sec and 
-                next_same["app"] == current["app"]):
-                # Absorb both the noise and the next same-app event
-                current["duration"] += noise["duration"] + next_same["duration"]
-                i += 2
+    Returns the new state (None while no rows have been seen); the given
+    state is not modified, so it can be advanced again from the same point.
+    """
+    if not rows:
+        return state
+    if state is None:
+        apps = []
+        durations = []
+        _, cur_app, cur_duration = rows[0]
+        rows = islice(rows, 1, None)
+        pending = None
+    else:
+        apps = list(state.apps)
+        durations = list(state.durations)
+        cur_app, cur_duration = state.current
+        pending = state.pending
+    has_pending = pending is not None
+    pending_app, pending_duration = pending if has_pending else (None, None)
+    
+    # Single streaming pass over the rows. "current" is the session being
+    # built and "pending" the run right after it. Once pending is complete
+    # (the next event has a different app), a short pending run followed by
+    # current's own app is absorbed: A -> short B -> A becomes one A.
+    for _, app, duration in rows:
+        if not has_pending:
+            if app == cur_app:
+                cur_duration += duration
             else:
-                break
-        
-        cleaned.append(current)
-        i += 1
-    
-    # Filter out remaining micro-sessions
-    real_sessions = [s for s in cleaned if s["duration"] >= noise_threshold_sec]
-    
-    return real_sessions
+                has_pending = True
+                pending_app, pending_duration = app, duration
+        elif app == pending_app:
+            pending_duration += duration
+        elif app == cur_app and pending_duration < threshold:
+            cur_duration += pending_duration + duration
+            has_pending = False
+        else:
+            if cur_duration >= threshold:
+                apps.append(cur_app)
+                durations.append(cur_duration)
+            cur_app, cur_duration = pending_app, pending_duration
+            pending_app, pending_duration = app, duration
+    
+    return _DebounceState(
+        apps,
+        durations,
+        (cur_app, cur_duration),
+        (pending_app, pending_duration) if has_pending else None,
+    )
+
+
+def _finish_debounce(state: Optional[_DebounceState], threshold: float) -> Sessions:
+    """Flush the tail of a debounce state and drop remaining micro-sessions."""
+    if state is None:
+        return Sessions([], [])
+    apps = list(state.apps)
+    durations = list(state.durations)
+    for run in (state.current, state.pending):
+        if run is not None and run[1] >= threshold:
+            apps.append(run[0])
+            durations.append(run[1])
+    return Sessions(apps, durations)
 
 
-def calculate_shannon_entropy(sessions: List[dict]) -> float:
+def calculate_shannon_entropy(sessions: Sessions) -> float:
     """
     Calculate Shannon entropy of app time distribution.
     
@@ -130,40 +224,31 @@ def calculate_shannon_entropy(sessions: List[dict]) -> float:
     Low entropy (< 1.0) = focused on few apps
     High entropy (> 3.0) = scattered across many apps
     """
-    if not sessions:
+    if not sessions.apps:
         return 0.0
     
     # Calculate total time per app
-    app_durations: Dict[str, float] = {}
-    for session in sessions:
-        app = session["app"]
-        duration = session["duration"]
-        app_durations[app] = app_durations.get(app, 0) + duration
+    app_durations: Dict[str, float] = defaultdict(float)
+    for app, duration in zip(sessions.apps, sessions.durations):
+        app_durations[app] += duration
     
     total_duration = sum(app_durations.values())
     if total_duration == 0:
         return 0.0
     
-    # Calculate probabilities and entropy
-    entropy = 0.0
-    for duration in app_durations.values():
-        p = duration / total_duration
-        if p > 0:
-            entropy -= p * math.log2(p)
-    
-    return entropy
+    # With p_i = d_i / T the sum rearranges to
+    # H = log2(T) - Σ(d_i * log2(d_i)) / T,
+    # which avoids a division per app and needs one log2 for the total
+    log2 = math.log2
+    weighted = sum(d * log2(d) for d in app_durations.values() if d > 0)
+    return max(0.0, log2(total_duration) - weighted / total_duration)
 
 
 def calculate_median(values: List[float]) -> float:
     """Calculate median of a list of values."""
     if not values:
         return 0.0
-    sorted_vals = sorted(values)
-    n = len(sorted_vals)
-    mid = n // 2
-    if n % 2 == 0:
-        return (sorted_vals[mid - 1] + sorted_vals[mid]) / 2
-    return sorted_vals[mid]
+    return statistics.median(values)
 
 
 def calculate_focus_score(
@@ -186,53 +271,147 @@ def calculate_focus_score(
         
         score = base_score + session_bonus - entropy_penalty
     """
-    # Base score from switch rate (exponential decay)
-    # At 0 switches/hour: 100, at 20 switches/hour: ~37, at 50: ~7
-    base_score = 100 * math.exp(-FOCUS_SCORE_K * switches_per_hour)
-    
-    # Session duration bonus (longer sessions = better)
-    # Capped contribution: 0-20 points based on median session
-    session_bonus = min(20, median_session_min)
-    
-    # Entropy penalty (more scattered = worse)
-    # Low entropy (< 1): minimal penalty
-    # High entropy (> 3): significant penalty
-    entropy_penalty = entropy * 5
-    
-    # Combine
-    score = base_score + session_bonus - entropy_penalty
+    return calculate_focus_score_batch(
+        (median_session_min,), (switches_per_hour,), (entropy,)
+    )[0]
+
+
+def calculate_focus_score_batch(
+    median_session_min: Sequence[float],
+    switches_per_hour: Sequence[float],
+    entropy: Sequence[float]
+) -> List[int]:
+    """
+    Calculate focus scores for many days at once.
     
-    # Clamp to 0-100
-    return max(0, min(100, int(round(score))))
+    Takes parallel sequences of per-day metrics and returns the scores in
+    the same order, using the formula documented on calculate_focus_score()
+    with the constants and math.exp looked up once for the whole batch.
+    """
+    exp = math.exp
+    neg_k = -FOCUS_SCORE_K
+    scores = []
+    for median, sph, ent in zip(median_session_min, switches_per_hour, entropy):
+        # Base score from switch rate (exponential decay)
+        # At 0 switches/hour: 100, at 20 switches/hour: ~37, at 50: ~7
+        base_score = 100 * exp(neg_k * sph)
+        
+        # Session duration bonus, capped at 20 points
+        session_bonus = median if median < 20 else 20
+        
+        # Entropy penalty: each unit of entropy costs 5 points
+        score = int(round(base_score + session_bonus - ent * 5))
+        
+        # Clamp to 0-100
+        scores.append(0 if score < 0 else 100 if score > 100 else score)
+    return scores
+
 
+# Last analysis of the current day: (day, time.monotonic() when computed, metrics)
+_TODAY_FOCUS: Optional[Tuple[date_type, float, Optional[FocusMetrics]]] = None
 
-def analyze_focus_for_date(date: datetime) -> Optional[FocusMetrics]:
+
+def analyze_focus_for_date(date: datetime, fresh_within_sec: float = 0) -> Optional[FocusMetrics]:
     """
     Analyze focus/context switching for a specific date.
     
+    Days that have already ended (see is_day_complete()) can't change, so
+    their results are memoized for the lifetime of the process. The
+    current day is analyzed incrementally from state kept in FOCUS_STATE_FILE,
+    and can be served from memory if it was analyzed less than
+    fresh_within_sec seconds ago.
+    
     Returns FocusMetrics or None if no data.
     """
-    events = get_window_events_for_date(date)
+    global _TODAY_FOCUS
+    day = date.date()
+    if is_day_complete(date):
+        return _analyze_focus_for_day(day)
+    
+    now = time.monotonic()
+    cached = _TODAY_FOCUS
+    if cached is not None and cached[0] == day and now - cached[1] < fresh_within_sec:
+        return cached[2]
+    metrics = _analyze_focus_incrementally(date)
+    _TODAY_FOCUS = (day, now, metrics)
+    return metrics
+
+
+def _analyze_focus_incrementally(date: datetime) -> Optional[FocusMetrics]:
+    """
+    Analyze the current day, only de-bouncing events that are new.
+    
+    The debounce state after the day's settled events (those that ended
+    more than SETTLE_MARGIN_SEC ago) is persisted in FOCUS_STATE_FILE with
+    the cutoff it covers and the start of the first event that wasn't
+    settled yet. Each call fetches from that start, so events spanning the
+    cutoff come back whole, and only processes events ending after the
+    previous cutoff.
+    """
+    threshold = NOISE_THRESHOLD_SEC
+    partial = load_focus_partial(date)
+    if (partial is None or partial.get("threshold") != threshold
+            or "fetch_from" not in partial):
+        fetch_from, since, state = 0.0, 0.0, None
+    else:
+        fetch_from = partial["fetch_from"]
+        since = partial["cutoff"]
+        state = _DebounceState(*partial["state"]) if partial["state"] else None
+    
+    cutoff = max(since, time.time() - SETTLE_MARGIN_SEC)
+    settled, live, fetch_from = get_window_events_since(date, fetch_from, since, cutoff)
+    state = _advance_debounce(state, _session_rows(settled), threshold)
+    save_focus_partial(date, {
+        "cutoff": cutoff,
+        "fetch_from": fetch_from,
+        "threshold": threshold,
+        "state": list(state) if state else None,
+    })
+    
+    sessions = _finish_debounce(_advance_debounce(state, _session_rows(live), threshold), threshold)
+    return _metrics_for_sessions(sessions)
+
+
+@functools.lru_cache(maxsize=64)
+def _analyze_focus_for_day(day: date_type) -> Optional[FocusMetrics]:
+    """Cached focus analysis of a completed calendar day."""
+    return analyze_focus_for_events(
+        get_window_events_for_date(datetime.combine(day, datetime.min.time())),
+        presorted=True,
+    )
+
+
+def analyze_focus_for_events(events: List[dict], presorted: bool = False) -> Optional[FocusMetrics]:
+    """
+    Analyze focus/context switching for already-fetched window events.
+    
+    Events should already be filtered to exclude AFK time, e.g. the
+    "window_events" returned by compute_daily_stats(). Pass presorted=True
+    when they are ordered oldest first, as those are.
     
+    Returns FocusMetrics or None if no data.
+    """
     if not events:
         return None
     
     # De-bounce to get real sessions
-    sessions = debounce_events(events)
-    
-    if not sessions:
+    return _metrics_for_sessions(debounce_events(events, presorted=presorted))
+
+
+def _metrics_for_sessions(sessions: Sessions) -> Optional[FocusMetrics]:
+    """Compute FocusMetrics from de-bounced sessions, or None if there are none."""
+    durations_sec = sessions.durations
+    if not durations_sec:
         return None
     
-    # Calculate metrics
-    durations_sec = [s["duration"] for s in sessions]
-    durations_min = [d / 60 for d in durations_sec]
-    
-    median_session_min = calculate_median(durations_min)
+    # Calculate metrics; the median is taken in seconds and scaled once
+    # rather than building a per-minute copy of the durations
+    median_session_min = calculate_median(durations_sec) / 60
     total_time_sec = sum(durations_sec)
     total_time_hours = total_time_sec / 3600
     
     # Switches per hour (number of context switches divided by active hours)
-    switches_per_hour = (len(sessions) - 1) / total_time_hours if total_time_hours > 0 else 0
+    switches_per_hour = (len(durations_sec) - 1) / total_time_hours if total_time_hours > 0 else 0
     
     # Shannon entropy
     entropy = calculate_shannon_entropy(sessions)
@@ -244,7 +423,7 @@ def analyze_focus_for_date(date: datetime) -> Optional[FocusMetrics]:
         median_session_min=median_session_min,
         switches_per_hour=switches_per_hour,
         shannon_entropy=entropy,
-        total_sessions=len(sessions),
+        total_sessions=len(durations_sec),
         total_time_min=total_time_sec / 60,
         focus_score=focus_score
     )
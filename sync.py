@@ -16,93 +16,99 @@ Usage:
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from typing import Tuple
 
 from activitywatch_client import (
     get_buckets,
-    get_screen_time_for_date,
-    get_social_time_for_date,
-    get_gpt_time_for_date,
+    compute_daily_stats,
+    cleanup_event_cache,
 )
 from focus_analyzer import (
-    analyze_focus_for_date,
+    analyze_focus_for_events,
     interpret_score,
 )
 from exist_client import (
     ensure_all_attributes,
-    push_screen_time,
-    push_social_time,
-    push_gpt_time,
-    push_focus_score,
+    push_daily_stats,
 )
-from config import (
-    EXIST_SCREEN_TIME_ATTR,
-    EXIST_SOCIAL_ATTR,
-    EXIST_GPT_ATTR,
-    EXIST_FOCUS_SCORE_ATTR,
-)
-from sync_state import mark_synced, get_unsynced_dates, cleanup_old_entries
+from sync_state import mark_synced_many, get_unsynced_dates, cleanup_old_entries
+
+# Upper bound on dates synced concurrently
+MAX_SYNC_WORKERS = 8
 
 
-def sync_date(date: datetime, dry_run: bool = False) -> bool:
+def sync_date(date: datetime, dry_run: bool = False) -> Tuple[datetime, bool]:
     """
     Sync all metrics for a specific date.
     
-    Returns True if all successful.
+    Output for the date is buffered and printed as one block, so dates
+    synced concurrently don't interleave their lines.
+    
+    Returns (date, ok) where ok is True if all successful.
     """
     date_str = date.strftime("%Y-%m-%d")
+    lines = []
     all_ok = True
     
     try:
-        # Get all metrics from ActivityWatch
-        screen_time = get_screen_time_for_date(date)
-        social_time = get_social_time_for_date(date)
-        gpt_time = get_gpt_time_for_date(date)
+        # Get all metrics from ActivityWatch in one pass
+        stats = compute_daily_stats(date)
+        screen_time = stats["screen_time"]
+        social_time = stats["social_time"]
+        gpt_time = stats["gpt_time"]
         
-        # Get focus score
-        focus_metrics = analyze_focus_for_date(date)
+        # Get focus score from the same window events. This deliberately
+        # doesn't use analyze_focus_for_date()'s incremental path for today:
+        # compute_daily_stats() has already fetched the whole day's window
+        # events for social time, so de-bouncing them here costs no extra
+        # round trips, while the incremental path would refetch them.
+        focus_metrics = analyze_focus_for_events(stats["window_events"], presorted=True)
         focus_score = focus_metrics.focus_score if focus_metrics else 50
         
-        print(f"{date_str}:")
-        print(f"  Screen time: {screen_time} min ({screen_time/60:.1f}h)")
-        print(f"  Social:      {social_time} min ({social_time/60:.1f}h)")
-        print(f"  AI/GPT:      {gpt_time} min ({gpt_time/60:.1f}h)")
-        print(f"  Focus score: {focus_score}/100", end="")
+        lines.append(f"{date_str}:")
+        lines.append(f"  Screen time: {screen_time} min ({screen_time/60:.1f}h)")
+        lines.append(f"  Social:      {social_time} min ({social_time/60:.1f}h)")
+        lines.append(f"  AI/GPT:      {gpt_time} min ({gpt_time/60:.1f}h)")
         if focus_metrics:
-            print(f" (median: {focus_metrics.median_session_min:.1f}m, "
-                  f"switches: {focus_metrics.switches_per_hour:.0f}/h)")
+            lines.append(f"  Focus score: {focus_score}/100"
+                         f" (median: {focus_metrics.median_session_min:.1f}m, "
+                         f"switches: {focus_metrics.switches_per_hour:.0f}/h)")
         else:
-            print(" (no data)")
+            lines.append(f"  Focus score: {focus_score}/100 (no data)")
         
         if dry_run:
-            print("  (dry run - not pushing)")
-            return True
+            lines.append("  (dry run - not pushing)")
+            return date, True
         
-        # Push to Exist.io
-        metrics = [
-            (EXIST_SCREEN_TIME_ATTR, screen_time, push_screen_time),
-            (EXIST_SOCIAL_ATTR, social_time, push_social_time),
-            (EXIST_GPT_ATTR, gpt_time, push_gpt_time),
-            (EXIST_FOCUS_SCORE_ATTR, focus_score, push_focus_score),
-        ]
+        # Push all metrics to Exist.io in one request
+        result = push_daily_stats({
+            "screen_time": screen_time,
+            "social_time": social_time,
+            "gpt_time": gpt_time,
+            "focus_score": focus_score,
+        }, date)
         
-        for attr_name, value, push_func in metrics:
-            result = push_func(value, date)
-            if result.get("success"):
-                pass  # Silent success
-            else:
-                print(f"  ✗ Failed {attr_name}: {result.get('failed', result)}")
-                all_ok = False
+        for entry in result.get("failed", []):
+            name = entry.get("name") if isinstance(entry, dict) else entry
+            lines.append(f"  ✗ Failed {name}: {entry}")
+            all_ok = False
+        if not result.get("success"):
+            all_ok = False
         
         if all_ok:
-            print("  ✓ Pushed to Exist.io")
-            mark_synced(date)
+            lines.append("  ✓ Pushed to Exist.io")
             
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        if not lines:
+            lines.append(f"{date_str}:")
+        lines.append(f"  ✗ Error: {e}")
         all_ok = False
+    finally:
+        print("\n".join(lines))
     
-    return all_ok
+    return date, all_ok
 
 
 def main():
@@ -178,14 +184,22 @@ def main():
             print(f"Backfilling {len(extras)} missed day(s)...")
             dates = sorted(set(extras + dates), key=lambda d: d.strftime("%Y-%m-%d"))
     
-    # Sync each date
-    success_count = 0
-    for date in dates:
-        if sync_date(date, args.dry_run):
-            success_count += 1
+    # Sync dates concurrently (the work is network-bound), then record the
+    # successful ones in one state write
+    synced = []
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_SYNC_WORKERS, len(dates)))) as executor:
+        futures = [executor.submit(sync_date, date, args.dry_run) for date in dates]
+        for future in as_completed(futures):
+            date, ok = future.result()
+            if ok:
+                synced.append(date)
+    success_count = len(synced)
+    if not args.dry_run:
+        mark_synced_many(synced)
     
-    # Periodic cleanup of old state entries
+    # Periodic cleanup of old state entries and cached events
     cleanup_old_entries()
+    cleanup_event_cache()
     
     print(f"\nSynced {success_count}/{len(dates)} days")
     
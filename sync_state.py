@@ -1,42 +1,128 @@
-"""Track which dates have been successfully synced."""
+"""Track which dates have been successfully synced, and the focus analysis
+state of the current day."""
 
 import json
 import os
+import shutil
+import tempfile
+import threading
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from config import SYNC_STATE_FILE, BACKFILL_DAYS
+# Use orjson for the state file when available, else the stdlib. Both
+# variants read and write bytes.
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+from config import SYNC_STATE_FILE, FOCUS_STATE_FILE, BACKFILL_DAYS
+
+
+# Parsed state and the file mtime it was read at, so repeated lookups in one
+# process don't re-read and re-parse the file. Callers must treat the returned
+# state as read-only and save a modified copy instead.
+_STATE_CACHE = None
+_STATE_MTIME = None
+
+# Serializes load-modify-save cycles between threads. It doesn't cover other
+# processes: overlapping sync runs can drop each other's marks, which only
+# means those dates are synced again.
+_STATE_LOCK = threading.Lock()
 
 
 def _load_state() -> dict:
-    """Load sync state from disk."""
-    if not os.path.exists(SYNC_STATE_FILE):
+    """Load sync state from disk (cached until the file changes)."""
+    global _STATE_CACHE, _STATE_MTIME
+    try:
+        mtime = os.stat(SYNC_STATE_FILE).st_mtime_ns
+    except OSError:
         return {"synced_dates": {}}
+    if _STATE_CACHE is not None and mtime == _STATE_MTIME:
+        return _STATE_CACHE
     try:
-        with open(SYNC_STATE_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        with open(SYNC_STATE_FILE, "rb") as f:
+            state = _json_loads(f.read())
+    except (ValueError, IOError):
         return {"synced_dates": {}}
+    _STATE_CACHE, _STATE_MTIME = state, mtime
+    return state
+
+
+# Process umask, for giving newly created state files the usual permissions
+# (read once at import; os.umask() can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_file_atomic(path: str, data: bytes) -> None:
+    """
+    Write data to path via a temporary file that then replaces the old one,
+    so a concurrent reader (possibly another process) never sees a
+    half-written file and mistakes it for an empty state.
+
+    A symlinked path has its target replaced, keeping the link, and the
+    file keeps its permissions (mkstemp() would make it private to the
+    owner).
+    """
+    path = os.path.realpath(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path),
+        prefix="." + os.path.basename(path) + ".",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def _save_state(state: dict) -> None:
     """Save sync state to disk."""
-    with open(SYNC_STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+    global _STATE_CACHE, _STATE_MTIME
+    _write_file_atomic(SYNC_STATE_FILE, _json_dumps(state))
+    _STATE_CACHE, _STATE_MTIME = state, os.stat(SYNC_STATE_FILE).st_mtime_ns
+
+
+def _date_key(date: datetime) -> str:
+    """State key for a date ("YYYY-MM-DD"); isoformat is cheaper than strftime."""
+    return date.isoformat()[:10]
 
 
 def mark_synced(date: datetime) -> None:
     """Record that a date was successfully synced."""
-    state = _load_state()
-    date_str = date.strftime("%Y-%m-%d")
-    state["synced_dates"][date_str] = datetime.now().isoformat()
-    _save_state(state)
+    mark_synced_many([date])
+
+
+def mark_synced_many(dates: List[datetime]) -> None:
+    """Record several successfully synced dates with a single state write."""
+    if not dates:
+        return
+    with _STATE_LOCK:
+        state = _load_state()
+        synced = dict(state.get("synced_dates", {}))
+        now = datetime.now().isoformat()
+        for date in dates:
+            synced[_date_key(date)] = now
+        _save_state({**state, "synced_dates": synced})
 
 
 def is_synced(date: datetime) -> bool:
     """Check if a date has been successfully synced."""
-    state = _load_state()
-    return date.strftime("%Y-%m-%d") in state["synced_dates"]
+    return _date_key(date) in _load_state().get("synced_dates", {})
 
 
 def get_unsynced_dates(days: int = None) -> List[datetime]:
@@ -59,7 +145,7 @@ def get_unsynced_dates(days: int = None) -> List[datetime]:
     unsynced = []
     for i in range(days, 0, -1):  # oldest first
         date = today - timedelta(days=i)
-        if date.strftime("%Y-%m-%d") not in synced:
+        if _date_key(date) not in synced:
             unsynced.append(date)
 
     return unsynced
@@ -67,9 +153,35 @@ def get_unsynced_dates(days: int = None) -> List[datetime]:
 
 def cleanup_old_entries(keep_days: int = 30) -> None:
     """Remove entries older than keep_days to prevent unbounded growth."""
-    state = _load_state()
-    cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
-    state["synced_dates"] = {
-        k: v for k, v in state["synced_dates"].items() if k >= cutoff
-    }
-    _save_state(state)
+    cutoff = _date_key(datetime.now() - timedelta(days=keep_days))
+    with _STATE_LOCK:
+        state = _load_state()
+        _save_state({**state, "synced_dates": {
+            k: v for k, v in state["synced_dates"].items() if k >= cutoff
+        }})
+
+
+def load_focus_partial(date: datetime) -> Optional[dict]:
+    """Get the stored incremental focus analysis state for a date, if any."""
+    try:
+        with open(FOCUS_STATE_FILE, "rb") as f:
+            stored = _json_loads(f.read())
+    except (ValueError, IOError):
+        return None
+    if not isinstance(stored, dict) or stored.get("date") != _date_key(date):
+        return None
+    return stored.get("partial")
+
+
+def save_focus_partial(date: datetime, partial: dict) -> None:
+    """
+    Store incremental focus analysis state for a date.
+
+    The state lives in its own file (FOCUS_STATE_FILE), so analysing today's
+    focus doesn't rewrite the sync history. Only one day is kept, and each
+    save replaces the whole file, so concurrent writers at worst overwrite
+    each other's progress, which the next analysis recomputes.
+    """
+    _write_file_atomic(
+        FOCUS_STATE_FILE, _json_dumps({"date": _date_key(date), "partial": partial})
+    )
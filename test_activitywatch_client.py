@@ -0,0 +1,166 @@
+"""Tests for activitywatch_client."""
+
+import os
+import random
+import re
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import activitywatch_client
+
+
+DAY = datetime(2024, 3, 5)
+DAY_START = DAY.replace(tzinfo=timezone.utc)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _overlap_seconds(ev_start, ev_end, intervals):
+    """The original per-event scan over every interval."""
+    total = 0.0
+    for intv_start, intv_end in intervals:
+        overlap_start = max(ev_start, intv_start)
+        overlap_end = min(ev_end, intv_end)
+        if overlap_start < overlap_end:
+            total += (overlap_end - overlap_start).total_seconds()
+    return total
+
+
+def _random_intervals(rnd: random.Random):
+    """Sorted, disjoint not-afk intervals over the day."""
+    intervals = []
+    t = DAY_START + timedelta(seconds=rnd.uniform(0, 600))
+    while t < DAY_START + timedelta(days=1):
+        end = t + timedelta(seconds=rnd.uniform(1, 3000))
+        intervals.append((t, end))
+        t = end + timedelta(seconds=rnd.uniform(1, 3000))
+    return intervals
+
+
+def _random_events(rnd: random.Random):
+    events = []
+    t = DAY_START
+    while t < DAY_START + timedelta(days=1):
+        duration = rnd.choice([rnd.uniform(0.1, 5), rnd.uniform(5, 2400)])
+        events.append({"timestamp": _iso(t), "duration": duration, "data": {"app": "A"}})
+        t += timedelta(seconds=duration + rnd.choice([0, rnd.uniform(0, 60)]))
+    return events
+
+
+class OverlapTest(unittest.TestCase):
+
+    def test_matches_per_interval_scan(self):
+        for seed in range(20):
+            rnd = random.Random(seed)
+            intervals = _random_intervals(rnd)
+            events = _random_events(rnd)
+            expected = {}
+            for event in events:
+                ev_start = datetime.fromisoformat(event["timestamp"].replace("Z", "+00:00"))
+                ev_end = ev_start + timedelta(seconds=event["duration"])
+                active = _overlap_seconds(ev_start, ev_end, intervals)
+                if active > 0:
+                    expected[event["timestamp"]] = active
+
+            shuffled = intervals[:]
+            rnd.shuffle(shuffled)
+            got = activitywatch_client.filter_events_by_not_afk(events[::-1], shuffled)
+            with self.subTest(seed=seed):
+                self.assertEqual([e["timestamp"] for e in got], list(expected))
+                for event in got:
+                    self.assertAlmostEqual(event["duration"], expected[event["timestamp"]], delta=1e-6)
+
+    def test_overlapping_intervals_count_once(self):
+        event = {"timestamp": _iso(DAY_START), "duration": 100, "data": {}}
+        intervals = [
+            (DAY_START + timedelta(seconds=10), DAY_START + timedelta(seconds=50)),
+            (DAY_START + timedelta(seconds=30), DAY_START + timedelta(seconds=70)),
+        ]
+        got = activitywatch_client.filter_events_by_not_afk([event], intervals)
+        self.assertEqual(len(got), 1)
+        self.assertAlmostEqual(got[0]["duration"], 60)
+
+
+class GptDomainTest(unittest.TestCase):
+
+    MATCHING = [
+        "https://chatgpt.com/c/123",
+        "https://claude.ai:443/chat",
+        "https://claude.ai",
+        "https://eu.claude.ai/new",
+        "HTTPS://ChatGPT.com?q=1",
+        "https://user:pw@claude.ai/#x",
+    ]
+    NOT_MATCHING = [
+        "https://notchatgpt.com/",
+        "https://claude.ai.example.com/",
+        "https://example.com/?next=https://claude.ai",
+        "claude.ai",
+        "",
+    ]
+
+    def _client_side(self, url: str) -> bool:
+        return activitywatch_client._is_gpt_domain(activitywatch_client._url_host(url))
+
+    def _server_side(self, url: str) -> bool:
+        return re.search(activitywatch_client._GPT_URL_QUERY_REGEX, url) is not None
+
+    def test_hosts(self):
+        for url in self.MATCHING:
+            with self.subTest(url=url):
+                self.assertTrue(self._client_side(url))
+                self.assertTrue(self._server_side(url))
+        for url in self.NOT_MATCHING:
+            with self.subTest(url=url):
+                self.assertFalse(self._client_side(url))
+                self.assertFalse(self._server_side(url))
+
+
+class EventCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self._patch("EVENT_CACHE_FILE", os.path.join(tmp.name, "aw_cache.sqlite"))
+        self.fetches = []
+        self._patch("_fetch_events", self._fetch)
+
+    def _patch(self, name, value):
+        patcher = mock.patch.object(activitywatch_client, name, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fetch(self, bucket_id, start, end):
+        self.fetches.append((bucket_id, start))
+        return [{"timestamp": _iso(start.replace(tzinfo=timezone.utc)), "duration": 1.5,
+                 "data": {"app": "A"}}]
+
+    def test_completed_day_is_served_from_cache(self):
+        first = activitywatch_client.get_events_for_date("bucket", DAY)
+        second = activitywatch_client.get_events_for_date("bucket", DAY)
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual(second, first)
+
+        activitywatch_client.get_events_for_date("other-bucket", DAY)
+        activitywatch_client.get_events_for_date("bucket", DAY + timedelta(days=1))
+        self.assertEqual(len(self.fetches), 3)
+
+    def test_current_day_is_always_fetched(self):
+        today = datetime.now()
+        activitywatch_client.get_events_for_date("bucket", today)
+        activitywatch_client.get_events_for_date("bucket", today)
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_clear_event_cache(self):
+        activitywatch_client.get_events_for_date("bucket", DAY)
+        activitywatch_client.clear_event_cache()
+        activitywatch_client.get_events_for_date("bucket", DAY)
+        self.assertEqual(len(self.fetches), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
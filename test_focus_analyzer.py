@@ -0,0 +1,138 @@
+"""Tests for focus_analyzer."""
+
+import copy
+import os
+import pickle
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import activitywatch_client
+import focus_analyzer
+import sync_state
+
+
+DAY = datetime(2024, 3, 5)
+DAY_START = DAY.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+class ClippingServer:
+    """
+    Fake ActivityWatch event source that only knows events up to `now`.
+
+    Like aw-server, events overlapping the requested range are returned
+    newest first and trimmed to the range bounds.
+    """
+
+    def __init__(self, seed: int):
+        rnd = random.Random(seed)
+        self.now = DAY_START
+        self.window = []
+        t = DAY_START + 10
+        while t < DAY_START + 86000:
+            duration = rnd.choice([rnd.uniform(0.1, 4), rnd.uniform(5, 1800), rnd.uniform(0, 30)])
+            self.window.append((t, duration, {"app": rnd.choice("ABCD")}))
+            t += duration + rnd.choice([0, 0, rnd.random()])
+        self.afk = []
+        t = DAY_START
+        status = "not-afk"
+        while t < DAY_START + 86400:
+            duration = rnd.uniform(60, 3000)
+            self.afk.append((t, duration, {"status": status}))
+            t += duration
+            status = "afk" if status == "not-afk" else "not-afk"
+
+    def fetch(self, bucket_id: str, start: datetime, end: datetime):
+        lo = start.replace(tzinfo=timezone.utc).timestamp()
+        hi = min(end.replace(tzinfo=timezone.utc).timestamp(), self.now)
+        source = self.window if "window" in bucket_id else self.afk
+        events = []
+        for ev_start, duration, data in source:
+            ev_end = min(ev_start + duration, self.now)
+            if ev_end <= lo or ev_start >= hi:
+                continue
+            clipped_start = max(ev_start, lo)
+            events.append({
+                "timestamp": _iso(clipped_start),
+                "duration": min(ev_end, hi) - clipped_start,
+                "data": data,
+            })
+        return events[::-1]
+
+    def events_for_date(self, bucket_id: str, date: datetime):
+        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.fetch(bucket_id, start, start + timedelta(days=1))
+
+
+class FocusMetricsTest(unittest.TestCase):
+
+    def test_copy_and_pickle_round_trip(self):
+        metrics = focus_analyzer.FocusMetrics(
+            median_session_min=12.5,
+            switches_per_hour=8.0,
+            shannon_entropy=1.25,
+            total_sessions=42,
+            total_time_min=310.0,
+            focus_score=64,
+        )
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                self.assertEqual(pickle.loads(pickle.dumps(metrics, protocol)), metrics)
+        self.assertEqual(copy.copy(metrics), metrics)
+        self.assertEqual(copy.deepcopy(metrics), metrics)
+        with self.assertRaises(AttributeError):
+            copy.copy(metrics).focus_score = 0
+
+
+class IncrementalFocusTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self._patch(sync_state, "FOCUS_STATE_FILE", os.path.join(tmp.name, "focus_state.json"))
+        self._patch(activitywatch_client, "find_window_bucket", lambda: "aw-watcher-window_test")
+        self._patch(activitywatch_client, "find_afk_bucket", lambda: "aw-watcher-afk_test")
+        self._patch(focus_analyzer, "find_window_bucket", lambda: "aw-watcher-window_test")
+
+    def _patch(self, target, name, value):
+        patcher = mock.patch.object(target, name, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _full_recompute(self):
+        return focus_analyzer.analyze_focus_for_events(
+            focus_analyzer.get_window_events_for_date(DAY), presorted=True
+        )
+
+    def test_matches_full_recompute_with_clipping_server(self):
+        for seed in range(3):
+            if os.path.exists(sync_state.FOCUS_STATE_FILE):
+                os.remove(sync_state.FOCUS_STATE_FILE)
+            server = ClippingServer(seed)
+            self._patch(activitywatch_client, "_fetch_events", server.fetch)
+            self._patch(activitywatch_client, "get_events_for_date", server.events_for_date)
+            self._patch(focus_analyzer, "get_events_for_date", server.events_for_date)
+
+            rnd = random.Random(seed)
+            for now in sorted(rnd.uniform(DAY_START + 3600, DAY_START + 86400) for _ in range(40)):
+                server.now = now
+                with mock.patch.object(focus_analyzer.time, "time", lambda: now):
+                    got = focus_analyzer._analyze_focus_incrementally(DAY)
+                expected = self._full_recompute()
+                with self.subTest(seed=seed, at=now - DAY_START):
+                    self.assertEqual(got is None, expected is None)
+                    if expected is not None:
+                        self.assertEqual(got.total_sessions, expected.total_sessions)
+                        self.assertEqual(got.focus_score, expected.focus_score)
+                        self.assertAlmostEqual(got.total_time_min, expected.total_time_min, places=6)
+                        self.assertAlmostEqual(got.median_session_min, expected.median_session_min, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()